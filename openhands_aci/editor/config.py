@@ -1,2 +1,4 @@
 MAX_RESPONSE_LEN_CHAR: int = 16000
 SNIPPET_CONTEXT_WINDOW: int = 4
+# Matches OHEditor.MAX_FILE_SIZE_MB, so every file the editor accepts by default keeps its undo history
+MAX_HISTORY_ENTRY_LEN_CHAR: int = 10 * 1024 * 1024
@@ -1,5 +1,4 @@
 import os
-import re
 import shutil
 import tempfile
 from pathlib import Path
@@ -18,7 +17,11 @@ from .exceptions import (
     ToolError,
 )
 from .history import FileHistoryManager
-from .prompts import DIRECTORY_CONTENT_TRUNCATED_NOTICE, FILE_CONTENT_TRUNCATED_NOTICE
+from .prompts import (
+    DIRECTORY_CONTENT_TRUNCATED_NOTICE,
+    FILE_CONTENT_TRUNCATED_NOTICE,
+    HISTORY_DROPPED_NOTICE,
+)
 from .results import CLIResult, maybe_truncate
 
 Command = Literal[
@@ -55,6 +58,8 @@ class OHEditor:
         """
         self._linter = DefaultLinter()
         self._history_manager = FileHistoryManager(max_history_per_file=10)
+        # Files whose edit history was discarded because a snapshot was too large
+        self._history_dropped: set[Path] = set()
         self._max_file_size = (
             (max_file_size_mb or self.MAX_FILE_SIZE_MB) * 1024 * 1024
         )  # Convert to bytes
@@ -130,17 +135,23 @@ class OHEditor:
         # Read the entire file first to handle both single-line and multi-line replacements
         file_content = self.read_file(path).expandtabs()
 
-        # Find all occurrences using regex
-        # Escape special regex characters in old_str to match it literally
-        pattern = re.escape(old_str)
-        occurrences = [
-            (
-                file_content.count('\n', 0, match.start()) + 1,  # line number
-                match.group(),  # matched text
-                match.start(),  # start position
+        # Find all non-overlapping occurrences with plain substring search
+        occurrences = []
+        # Line numbers are counted on from the previous match, so the content is scanned once
+        line, counted_to = 1, 0
+        start = file_content.find(old_str)
+        while start != -1:
+            line += file_content.count('\n', counted_to, start)
+            counted_to = start
+            occurrences.append(
+                (
+                    line,  # line number
+                    old_str,  # matched text
+                    start,  # start position
+                )
             )
-            for match in re.finditer(pattern, file_content)
-        ]
+            # Step past the match; an empty old_str matches at every position
+            start = file_content.find(old_str, start + max(len(old_str), 1))
 
         if not occurrences:
             raise ToolError(
@@ -164,14 +175,16 @@ class OHEditor:
         self.write_file(path, new_file_content)
 
         # Save the content to history
-        self._history_manager.add_history(path, file_content)
+        history_notice = self._save_history(path, file_content)
 
         # Create a snippet of the edited section
         start_line = max(0, replacement_line - SNIPPET_CONTEXT_WINDOW)
         end_line = replacement_line + SNIPPET_CONTEXT_WINDOW + new_str.count('\n')
 
-        # Read just the snippet range
-        snippet = self.read_file(path, start_line=start_line, end_line=end_line)
+        # Take the snippet from the new content instead of reading the file back
+        snippet = self._slice_lines(
+            new_file_content, idx, replacement_line, start_line, end_line
+        )
 
         # Prepare the success message
         success_message = f'The file {path} has been edited. '
@@ -185,6 +198,8 @@ class OHEditor:
             success_message += '\n' + lint_results + '\n'
 
         success_message += 'Review the changes and make sure they are as expected. Edit the file again if necessary.'
+        if history_notice:
+            success_message += '\n' + history_notice
         return CLIResult(
             output=success_message,
             prev_exist=True,
@@ -363,7 +378,7 @@ class OHEditor:
 
         # Save history - we already have the lines in memory
         file_text = ''.join(history_lines)
-        self._history_manager.add_history(path, file_text)
+        history_notice = self._save_history(path, file_text)
 
         # Read new content for result
         new_file_text = self.read_file(path)
@@ -381,6 +396,8 @@ class OHEditor:
             success_message += '\n' + lint_results + '\n'
 
         success_message += 'Review the changes and make sure they are as expected (correct indentation, no duplicate lines, etc). Edit the file again if necessary.'
+        if history_notice:
+            success_message += '\n' + history_notice
         return CLIResult(
             output=success_message,
             prev_exist=True,
@@ -389,6 +406,17 @@ class OHEditor:
             new_content=new_file_text,
         )
 
+    def _save_history(self, path: Path, content: str) -> str:
+        """
+        Save the content of a file before an edit; return a notice for the output if it was too large to keep.
+        """
+        if self._history_manager.add_history(path, content):
+            return ''
+        self._history_dropped.add(path)
+        return HISTORY_DROPPED_NOTICE.format(
+            max_len=self._history_manager.max_entry_len
+        )
+
     def validate_path(self, command: Command, path: Path) -> None:
         """
         Check that the path/command combination is valid.
@@ -428,6 +456,10 @@ class OHEditor:
         current_text = self.read_file(path).expandtabs()
         old_text = self._history_manager.pop_last_history(path)
         if old_text is None:
+            if path in self._history_dropped:
+                raise ToolError(
+                    f'Cannot undo edits to {path}: the file exceeded {self._history_manager.max_entry_len} characters, so its edit history was not kept.'
+                )
             raise ToolError(f'No edit history found for {path}.')
 
         self.write_file(path, old_text)
@@ -506,6 +538,36 @@ class OHEditor:
         except Exception as e:
             raise ToolError(f'Ran into {e} while trying to read {path}') from None
 
+    def _slice_lines(
+        self,
+        text: str,
+        anchor: int,
+        anchor_line: int,
+        start_line: int,
+        end_line: int,
+    ) -> str:
+        """
+        Return lines `start_line` to `end_line` (1-based, inclusive) of `text`, like `read_file` does.
+
+        `anchor` is an offset within line `anchor_line`; lines are located by scanning
+        outwards from it rather than from the start of `text`.
+        """
+        line_start = text.rfind('\n', 0, anchor) + 1
+
+        start = line_start
+        for _ in range(anchor_line - max(1, start_line)):
+            if start == 0:
+                break
+            start = text.rfind('\n', 0, start - 1) + 1
+
+        end = line_start
+        for _ in range(end_line - anchor_line + 1):
+            newline = text.find('\n', end)
+            if newline == -1:
+                return text[start:]
+            end = newline + 1
+        return text[start:end]
+
     def _make_output(
         self,
         snippet_content: str,
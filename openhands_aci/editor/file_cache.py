@@ -33,8 +33,9 @@ class FileCache:
 
     def set(self, key: str, value: Any) -> None:
         file_path = self._get_file_path(key)
-        content = json.dumps({'key': key, 'value': value})
-        content_size = len(content.encode('utf-8'))
+        # Encode once and reuse the bytes for both the size and the write
+        content = json.dumps({'key': key, 'value': value}).encode('utf-8')
+        content_size = len(content)
         logger.debug(f'Setting key: {key}, content_size: {content_size}')
 
         if self.size_limit is not None:
@@ -68,7 +69,7 @@ class FileCache:
                 f'Existing file removed from current_size: {self.current_size}'
             )
 
-        with open(file_path, 'w') as f:
+        with open(file_path, 'wb') as f:
             f.write(content)
 
         self.current_size += content_size
@@ -1,66 +1,172 @@
 """History management for file edits with disk-based storage and memory constraints."""
 
 import logging
+import os
 import tempfile
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+from .config import MAX_HISTORY_ENTRY_LEN_CHAR
 from .file_cache import FileCache
 
+# Slice size used when scanning for the common prefix/suffix of two snapshots
+_DELTA_SCAN_CHUNK = 4096
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    """Return the length of the longest common prefix of `a` and `b`."""
+    limit = min(len(a), len(b))
+    lo = hi = 0
+    # Compare whole chunks first to find the one holding the first difference
+    while hi < limit:
+        lo, hi = hi, min(hi + _DELTA_SCAN_CHUNK, limit)
+        if a[lo:hi] != b[lo:hi]:
+            break
+    else:
+        return limit
+    # Halve the differing window until only its first character is left
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _common_suffix_len(a: str, b: str, limit: int) -> int:
+    """Return the length of the longest common suffix of `a` and `b`, at most `limit`."""
+    len_a, len_b = len(a), len(b)
+    lo = hi = 0
+    while hi < limit:
+        lo, hi = hi, min(hi + _DELTA_SCAN_CHUNK, limit)
+        if a[len_a - hi : len_a - lo] != b[len_b - hi : len_b - lo]:
+            break
+    else:
+        return limit
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[len_a - mid : len_a - lo] == b[len_b - mid : len_b - lo]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _make_delta(base: str, target: str) -> list:
+    """Encode `target` as `[prefix_len, suffix_len, middle]` relative to `base`.
+
+    Edits touch one region of a file, so consecutive snapshots share everything
+    outside it and the delta is roughly the size of the edit.
+    """
+    prefix = _common_prefix_len(base, target)
+    suffix = _common_suffix_len(base, target, min(len(base), len(target)) - prefix)
+    return [prefix, suffix, target[prefix : len(target) - suffix]]
+
+
+def _apply_delta(base: str, delta: list) -> str:
+    """Rebuild the snapshot encoded by `delta` from `base`."""
+    prefix, suffix, middle = delta
+    return base[:prefix] + middle + base[len(base) - suffix :]
+
 
 class FileHistoryManager:
     """Manages file edit history with disk-based storage and memory constraints."""
 
     def __init__(
-        self, max_history_per_file: int = 5, history_dir: Optional[Path] = None
+        self,
+        max_history_per_file: int = 5,
+        history_dir: Optional[Path] = None,
+        max_entry_len: Optional[int] = MAX_HISTORY_ENTRY_LEN_CHAR,
     ):
         """Initialize the history manager.
 
         Args:
             max_history_per_file: Maximum number of history entries to keep per file (default: 5)
             history_dir: Directory to store history files. If None, uses a temp directory
+            max_entry_len: Maximum number of characters in a single history entry. If None, entries are unbounded
 
         Notes:
             - Each file's history is limited to the last N entries to conserve memory
             - The file cache is limited to prevent excessive disk usage
             - Older entries are automatically removed when limits are exceeded
+            - Entries larger than max_entry_len are not stored, so a single huge file cannot evict the history of other files
         """
         self.max_history_per_file = max_history_per_file
+        self.max_entry_len = max_entry_len
         if history_dir is None:
             history_dir = Path(tempfile.mkdtemp(prefix='oh_editor_history_'))
         self.cache = FileCache(str(history_dir))
         self.logger = logging.getLogger(__name__)
 
-    def _get_metadata_key(self, file_path: Path) -> str:
-        return f'{file_path}.metadata'
+    def _get_metadata_key(self, key: str) -> str:
+        return f'{key}.metadata'
 
-    def _get_history_key(self, file_path: Path, counter: int) -> str:
-        return f'{file_path}.{counter}'
+    def _get_history_key(self, key: str) -> str:
+        return f'{key}.history'
 
-    def add_history(self, file_path: Path, content: str):
-        """Add a new history entry for a file."""
-        metadata_key = self._get_metadata_key(file_path)
-        metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
-        counter = metadata['counter']
+    def add_history(self, file_path: Path, content: str) -> bool:
+        """Add a new history entry for a file.
 
-        # Add new entry
-        history_key = self._get_history_key(file_path, counter)
-        self.cache.set(history_key, content)
+        Returns:
+            False if the entry exceeded max_entry_len and the file's history was cleared.
+        """
+        return self.add_history_many(file_path, [content])
 
-        metadata['entries'].append(counter)
-        metadata['counter'] += 1
+    def add_history_many(self, file_path: Path, contents: Iterable[str]) -> bool:
+        """Add several history entries for a file, oldest first.
 
-        # Keep only last N entries
-        while len(metadata['entries']) > self.max_history_per_file:
-            old_counter = metadata['entries'].pop(0)
-            old_history_key = self._get_history_key(file_path, old_counter)
-            self.cache.delete(old_history_key)
+        The file's history and metadata are read and written once for the whole batch.
 
-        self.cache.set(metadata_key, metadata)
+        Returns:
+            False if an entry exceeded max_entry_len and the file's history was cleared.
+        """
+        key = os.fspath(file_path)
+        metadata_key = self._get_metadata_key(key)
+        history_key = self._get_history_key(key)
+        metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
+        counter = metadata['counter']
+        # Bounded deques evict the oldest entries as new ones are appended
+        entries = deque(metadata['entries'], maxlen=self.max_history_per_file)
+        history = deque(
+            self.cache.get(history_key, []), maxlen=self.max_history_per_file
+        )
+
+        stored_all = True
+        for content in contents:
+            if self.max_entry_len is not None and len(content) > self.max_entry_len:
+                # A truncated snapshot would corrupt the file on undo, and older entries
+                # can no longer be restored in order, so drop the file's history instead.
+                self.logger.warning(
+                    f'History entry for {file_path} exceeds {self.max_entry_len} characters; clearing its history'
+                )
+                entries.clear()
+                history.clear()
+                stored_all = False
+                continue
+
+            # Add new entry; the previous newest entry becomes a delta against it
+            if history:
+                history[-1] = _make_delta(content, history[-1])
+            entries.append(counter)
+            counter += 1
+            history.append(content)
+
+        # All entries of a file live in a single cache value. Only the newest entry
+        # is stored in full, each older one is a delta against the entry after it.
+        if history:
+            self.cache.set(history_key, list(history))
+        else:
+            self.cache.delete(history_key)
+        self.cache.set(metadata_key, {'entries': list(entries), 'counter': counter})
+        return stored_all
 
     def pop_last_history(self, file_path: Path) -> Optional[str]:
         """Pop and return the most recent history entry for a file."""
-        metadata_key = self._get_metadata_key(file_path)
+        key = os.fspath(file_path)
+        metadata_key = self._get_metadata_key(key)
+        history_key = self._get_history_key(key)
         metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
         entries = metadata['entries']
 
@@ -68,14 +174,18 @@ class FileHistoryManager:
             return None
 
         # Pop and remove the last entry
-        last_counter = entries.pop()
-        history_key = self._get_history_key(file_path, last_counter)
-        content = self.cache.get(history_key)
+        entries.pop()
+        history = self.cache.get(history_key, [])
+        content = history.pop() if history else None
 
         if content is None:
             self.logger.warning(f'History entry not found for {file_path}')
+        elif history:
+            # The entry before it becomes the newest, so store it in full
+            history[-1] = _apply_delta(content, history[-1])
+            self.cache.set(history_key, history)
         else:
-            # Remove the entry from the cache
+            # Remove the blob once the last entry is gone
             self.cache.delete(history_key)
 
         # Update metadata
@@ -86,34 +196,28 @@ class FileHistoryManager:
 
     def get_metadata(self, file_path: Path):
         """Get metadata for a file (for testing purposes)."""
-        metadata_key = self._get_metadata_key(file_path)
+        key = os.fspath(file_path)
+        metadata_key = self._get_metadata_key(key)
         metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
         return metadata  # Return the actual metadata, not a copy
 
     def clear_history(self, file_path: Path):
         """Clear history for a given file."""
-        metadata_key = self._get_metadata_key(file_path)
+        key = os.fspath(file_path)
+        metadata_key = self._get_metadata_key(key)
         metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
 
         # Delete all history entries
-        for counter in metadata['entries']:
-            history_key = self._get_history_key(file_path, counter)
-            self.cache.delete(history_key)
+        self.cache.delete(self._get_history_key(key))
 
-        # Clear metadata
-        self.cache.set(metadata_key, {'entries': [], 'counter': 0})
+        # Clear the entries but keep the counter, so keys are never reused for a file
+        self.cache.set(metadata_key, {'entries': [], 'counter': metadata['counter']})
 
     def get_all_history(self, file_path: Path) -> List[str]:
-        """Get all history entries for a file."""
-        metadata_key = self._get_metadata_key(file_path)
-        metadata = self.cache.get(metadata_key, {'entries': [], 'counter': 0})
-        entries = metadata['entries']
-
-        history = []
-        for counter in entries:
-            history_key = self._get_history_key(file_path, counter)
-            content = self.cache.get(history_key)
-            if content is not None:
-                history.append(content)
-
+        """Get all history entries for a file, oldest first."""
+        key = os.fspath(file_path)
+        history = self.cache.get(self._get_history_key(key), [])
+        # Rebuild older entries from the newest one, which is stored in full
+        for i in range(len(history) - 2, -1, -1):
+            history[i] = _apply_delta(history[i + 1], history[i])
         return history
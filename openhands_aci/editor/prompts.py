@@ -3,3 +3,5 @@ CONTENT_TRUNCATED_NOTICE = '<response clipped><NOTE>Due to the max output limit,
 FILE_CONTENT_TRUNCATED_NOTICE: str = '<response clipped><NOTE>Due to the max output limit, only part of this file has been shown to you. You should retry this tool after you have searched inside the file with `grep -n` in order to find the line numbers of what you are looking for.</NOTE>'
 
 DIRECTORY_CONTENT_TRUNCATED_NOTICE: str = '<response clipped><NOTE>Due to the max output limit, only part of this directory has been shown to you. You should use `ls -la` instead to view large directories incrementally.</NOTE>'
+
+HISTORY_DROPPED_NOTICE: str = '<NOTE>Undo is unavailable for this edit: the previous content of the file exceeds {max_len} characters, so it was not saved and the earlier edit history of this file was discarded.</NOTE>'
@@ -1,4 +1,5 @@
 from dataclasses import asdict, dataclass, fields
+from typing import AnyStr
 
 from .config import MAX_RESPONSE_LEN_CHAR
 from .prompts import CONTENT_TRUNCATED_NOTICE
@@ -35,15 +36,19 @@ class CLIResult(ToolResult):
 
 
 def maybe_truncate(
-    content: str,
+    content: AnyStr,
     truncate_after: int | None = MAX_RESPONSE_LEN_CHAR,
     truncate_notice: str = CONTENT_TRUNCATED_NOTICE,
-) -> str:
+) -> AnyStr:
     """
     Truncate content and append a notice if content exceeds the specified length.
+
+    Bytes content is cut through a memoryview, so the kept prefix is copied only once.
     """
-    return (
-        content
-        if not truncate_after or len(content) <= truncate_after
-        else content[:truncate_after] + truncate_notice
-    )
+    if not truncate_after or len(content) <= truncate_after:
+        return content
+    if isinstance(content, bytes):
+        return b''.join(
+            (memoryview(content)[:truncate_after], truncate_notice.encode())
+        )
+    return content[:truncate_after] + truncate_notice
@@ -7,6 +7,26 @@ DEBUG = os.getenv('DEBUG', 'False').lower() in ['true', '1', 'yes']
 if DEBUG:
     LOG_LEVEL = 'DEBUG'
 
+
+class MinuteCachedFormatter(logging.Formatter):
+    """Formatter that only re-renders `asctime` when the minute changes.
+
+    Only valid for a `datefmt` with minute (or coarser) precision.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_int_min: int | None = None
+        self._last_str = ''
+
+    def formatTime(self, record, datefmt=None):
+        int_min = int(record.created // 60)
+        if int_min != self._last_int_min:
+            self._last_str = super().formatTime(record, datefmt)
+            self._last_int_min = int_min
+        return self._last_str
+
+
 oh_aci_logger = logging.getLogger('openhands_aci')
 
 current_log_level = logging.INFO
@@ -15,7 +35,7 @@ if LOG_LEVEL in logging.getLevelNamesMapping():
 
 console_handler = logging.StreamHandler()
 console_handler.setLevel(current_log_level)
-formatter = logging.Formatter(
+formatter = MinuteCachedFormatter(
     '{asctime} - {name}:{levelname} - {message}',
     style='{',
     datefmt='%Y-%m-%d %H:%M',
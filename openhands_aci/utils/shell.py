@@ -1,12 +1,39 @@
 import os
+import signal
 import subprocess
+import sys
 import time
+from typing import Any
 
 from openhands_aci.editor.config import MAX_RESPONSE_LEN_CHAR
 from openhands_aci.editor.prompts import CONTENT_TRUNCATED_NOTICE
 from openhands_aci.editor.results import maybe_truncate
 
 
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """Kill a process started by `run_shell_cmd` together with its children."""
+    try:
+        if sys.platform == 'win32':
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+            process.kill()
+        else:
+            # The shell leads its own session, so its pid is also the group id
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # Already exited
+
+
+def _stop_process(process: subprocess.Popen) -> None:
+    """Kill the process group of `process`, reap the shell and close its pipes."""
+    _kill_process_group(process)
+    # Reap the shell without draining its pipes: a descendant that left the
+    # process group (e.g. via setsid) may still hold them open indefinitely
+    process.wait()
+    for pipe in (process.stdout, process.stderr):
+        if pipe is not None:
+            pipe.close()
+
+
 def run_shell_cmd(
     cmd: str,
     timeout: float | None = 120.0,  # seconds
@@ -26,30 +53,47 @@ def run_shell_cmd(
 
     start_time = time.time()
 
-    try:
-        process = subprocess.Popen(
-            cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+    # Run the shell in its own process group so that a timeout also
+    # kills any children it spawned (e.g. the stages of a pipeline)
+    group_kwargs: dict[str, Any]
+    if sys.platform == 'win32':
+        group_kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_kwargs = {'start_new_session': True}
+    process = subprocess.Popen(
+        cmd,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        **group_kwargs,
+    )
 
+    try:
         stdout, stderr = process.communicate(timeout=timeout)
-
-        return (
-            process.returncode or 0,
-            maybe_truncate(
-                stdout, truncate_after=truncate_after, truncate_notice=truncate_notice
-            ),
-            maybe_truncate(
-                stderr,
-                truncate_after=truncate_after,
-                truncate_notice=CONTENT_TRUNCATED_NOTICE,
-            ),  # Use generic notice for stderr
-        )
     except subprocess.TimeoutExpired:
-        process.kill()
+        _stop_process(process)
         elapsed_time = time.time() - start_time
         raise TimeoutError(
             f"Command '{cmd}' timed out after {elapsed_time:.2f} seconds"
         )
+    except BaseException:
+        # The command no longer shares the terminal's process group, so e.g. a
+        # Ctrl-C would not reach it: stop it here before propagating
+        _stop_process(process)
+        raise
+
+    return (
+        process.returncode or 0,
+        maybe_truncate(
+            stdout, truncate_after=truncate_after, truncate_notice=truncate_notice
+        ),
+        maybe_truncate(
+            stderr,
+            truncate_after=truncate_after,
+            truncate_notice=CONTENT_TRUNCATED_NOTICE,
+        ),  # Use generic notice for stderr
+    )
 
 
 def check_tool_installed(tool_name: str) -> bool:
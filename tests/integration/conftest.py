@@ -0,0 +1,50 @@
+import pytest
+
+from openhands_aci.editor.editor import OHEditor
+
+
+@pytest.fixture(scope='session')
+def oh_editor():
+    """Create one editor per session.
+
+    Undo history is keyed by path and every test writes under its own tmp_path.
+    """
+    return OHEditor()
+
+
+@pytest.fixture
+def editor(oh_editor, tmp_path):
+    # Set up a temporary directory with test files
+    test_file = tmp_path / 'test.txt'
+    test_file.write_bytes(b'This is a test file.\nThis file is for testing purposes.')
+    return oh_editor, test_file
+
+
+@pytest.fixture
+def editor_python_file_with_tabs(oh_editor, tmp_path):
+    # Set up a temporary directory with test files
+    test_file = tmp_path / 'test.py'
+    test_file.write_bytes(b'def test():\n\tprint("Hello, World!")')
+    return oh_editor, test_file
+
+
+@pytest.fixture(scope='session')
+def symlink_tree(tmp_path_factory):
+    """Create a symlink to a small directory tree once; tests only view it."""
+    root = tmp_path_factory.mktemp('symlink')
+
+    # Create a directory with some test files
+    source_dir = root / 'source_dir'
+    source_dir.mkdir()
+    (source_dir / 'file1.txt').write_bytes(b'content1')
+    (source_dir / 'file2.txt').write_bytes(b'content2')
+
+    # Create a subdirectory with a file
+    subdir = source_dir / 'subdir'
+    subdir.mkdir()
+    (subdir / 'file3.txt').write_bytes(b'content3')
+
+    # Create a symlink to the directory
+    symlink_dir = root / 'symlink_dir'
+    symlink_dir.symlink_to(source_dir)
+    return symlink_dir
@@ -1,21 +1,122 @@
-import json
-import tempfile
+import mmap
+import os
+import re
+from array import array
 from pathlib import Path
 
+import psutil
 import pytest
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+OH_ACI_OUTPUT_RE = re.compile(
+    r'<oh_aci_output_[0-9a-f]{32}>(.*?)</oh_aci_output_[0-9a-f]{32}>', re.DOTALL
+)
+
+
+@pytest.fixture(scope='session')
+def proc():
+    """Handle to the test process, shared so memory sampling does not rebuild it."""
+    return psutil.Process()
+
+
+@pytest.fixture(scope='module')
+def temp_dir(tmp_path_factory):
+    """Create one temporary directory per test module."""
+    return tmp_path_factory.mktemp('editor')
+
 
 @pytest.fixture
-def temp_file():
+def temp_file(temp_dir, request):
     """Create a temporary file for testing."""
-    with tempfile.NamedTemporaryFile(delete=False) as f:
-        yield Path(f.name)
-        try:
-            Path(f.name).unlink()
-        except FileNotFoundError:
-            pass
+    # One file per test keeps the editor's path-keyed undo history isolated
+    path = temp_dir / f'{request.node.name}.txt'
+    path.touch()
+    yield path
+    path.unlink(missing_ok=True)
+
+
+@pytest.fixture(scope='session')
+def big_temp_file(tmp_path_factory):
+    """Create a 9.5MB numbered-lines file once per session.
+
+    Tests must only read this file; use `temp_file` for anything that edits.
+    """
+    # 9.5MB to stay under the 10MB file size limit
+    file_size_mb = 9.5
+    line_size = 100  # bytes per line approximately
+    num_lines = int((file_size_mb * 1024 * 1024) // line_size)
+
+    path = tmp_path_factory.mktemp('memory') / 'big.txt'
+    write_numbered_lines(path, num_lines, line_size)
+    return path
+
+
+def write_numbered_lines(path: Path, num_lines: int, line_size: int = 100):
+    """Write `num_lines` lines of the form 'Line {i}: xxx...' to `path`.
+
+    The file is sized up front and filled through a memory map in chunks, which
+    keeps setup of multi-MB files fast.
+    """
+    line_tail = b'x' * (line_size - 10) + b'\n'
+    chunk_lines = 4096
+
+    # 'Line ' + digits + ': ' + tail for every line
+    total_size = num_lines * (len(b'Line : ') + len(line_tail))
+    width, lo = 1, 0
+    while lo < num_lines:
+        hi = min(10**width, num_lines)
+        total_size += (hi - lo) * width
+        width, lo = width + 1, hi
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, total_size)
+        if not total_size:
+            return
+        with mmap.mmap(fd, total_size) as mm:
+            pos = 0
+            for start in range(0, num_lines, chunk_lines):
+                end = min(start + chunk_lines, num_lines)
+                # join() materializes its input anyway, a list skips the generator
+                chunk = b''.join(
+                    [b'Line %d: %b' % (i, line_tail) for i in range(start, end)]
+                )
+                mm[pos : pos + len(chunk)] = chunk
+                pos += len(chunk)
+            mm.flush()
+    finally:
+        os.close(fd)
+
+
+def build_line_offsets(path: Path) -> array:
+    """Return the byte offset of the start of every line in `path`.
+
+    The last element is the file size, so line `i` (0-based) spans
+    `offsets[i]:offsets[i + 1]`.
+    """
+    offsets = array('Q', [0])
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = mm.find(b'\n')
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = mm.find(b'\n', pos + 1)
+        if offsets[-1] != len(mm):
+            offsets.append(len(mm))
+    return offsets
+
+
+def read_line_range(path: Path, offsets: array, start_line: int, end_line: int) -> str:
+    """Read lines `start_line` to `end_line` (1-based, inclusive) via mmap."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[offsets[start_line - 1] : offsets[end_line]].decode()
 
 
 def parse_result(result: str) -> dict:
     """Parse the JSON result from file_editor."""
-    return json.loads(result[result.find('{') : result.rfind('}') + 1])
+    match = OH_ACI_OUTPUT_RE.search(result)
+    assert match, 'Output does not contain the expected <oh_aci_output_> tags.'
+    return json_loads(match.group(1))
@@ -1,11 +1,8 @@
 """Tests for basic file editor operations."""
 
-import json
-import re
-
 from openhands_aci.editor import file_editor
 
-from .conftest import parse_result
+from .conftest import OH_ACI_OUTPUT_RE, json_loads, parse_result
 
 
 def test_file_editor_happy_path(temp_file):
@@ -14,8 +11,8 @@ def test_file_editor_happy_path(temp_file):
     new_str = 'sample file'
 
     # Create test file
-    with open(temp_file, 'w') as f:
-        f.write('This is a test file.\nThis file is for testing purposes.')
+    with open(temp_file, 'wb') as f:
+        f.write(b'This is a test file.\nThis file is for testing purposes.')
 
     # Call the `file_editor` function
     result = file_editor(
@@ -27,13 +24,9 @@ def test_file_editor_happy_path(temp_file):
     )
 
     # Extract the JSON content using a regular expression
-    match = re.search(
-        r'<oh_aci_output_[0-9a-f]{32}>(.*?)</oh_aci_output_[0-9a-f]{32}>',
-        result,
-        re.DOTALL,
-    )
+    match = OH_ACI_OUTPUT_RE.search(result)
     assert match, 'Output does not contain the expected <oh_aci_output_> tags in the correct format.'
-    result_dict = json.loads(match.group(1))
+    result_dict = json_loads(match.group(1))
 
     # Validate the formatted output in the result dictionary
     formatted_output = result_dict['formatted_output_and_error']
@@ -72,8 +65,8 @@ match = re.search(
 ...More text here.
 """
 
-    with open(temp_file, 'w') as f:
-        f.write(xml_content)
+    with open(temp_file, 'wb') as f:
+        f.write(xml_content.encode())
 
     result = file_editor(
         command='view',
@@ -81,14 +74,10 @@ match = re.search(
     )
 
     # Ensure the content is extracted correctly
-    match = re.search(
-        r'<oh_aci_output_[0-9a-f]{32}>(.*?)</oh_aci_output_[0-9a-f]{32}>',
-        result,
-        re.DOTALL,
-    )
+    match = OH_ACI_OUTPUT_RE.search(result)
 
     assert match, 'Output does not contain the expected <oh_aci_output_> tags in the correct format.'
-    result_dict = json.loads(match.group(1))
+    result_dict = json_loads(match.group(1))
 
     # Validate the formatted output in the result dictionary
     formatted_output = result_dict['formatted_output_and_error']
@@ -111,8 +100,8 @@ def test_successful_operations(temp_file):
     """Test successful file operations and their output formatting."""
     # Create a test file
     content = 'line 1\nline 2\nline 3\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Test view
     result = file_editor(
@@ -165,8 +154,8 @@ def test_tab_expansion(temp_file):
     """Test that tabs are properly expanded in file operations."""
     # Create a file with tabs
     content = 'no tabs\n\tindented\nline\twith\ttabs\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Test view command
     result = file_editor(
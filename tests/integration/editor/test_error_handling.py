@@ -36,8 +36,8 @@ def test_str_replace_error_handling(temp_file):
     """Test error handling in str_replace command."""
     # Create a test file
     content = 'line 1\nline 2\nline 3\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Test non-existent string
     result = file_editor(
@@ -52,8 +52,8 @@ def test_str_replace_error_handling(temp_file):
     assert 'did not appear verbatim' in result_json['error']
 
     # Test multiple occurrences
-    with open(temp_file, 'w') as f:
-        f.write('line\nline\nother')
+    with open(temp_file, 'wb') as f:
+        f.write(b'line\nline\nother')
 
     result = file_editor(
         command='str_replace',
@@ -71,8 +71,8 @@ def test_view_range_validation(temp_file):
     """Test validation of view_range parameter."""
     # Create a test file
     content = 'line 1\nline 2\nline 3\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Test invalid range format
     result = file_editor(
@@ -117,8 +117,8 @@ def test_insert_validation(temp_file):
     """Test validation in insert command."""
     # Create a test file
     content = 'line 1\nline 2\nline 3\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Test insert at negative line
     result = file_editor(
@@ -147,8 +147,8 @@ def test_undo_validation(temp_file):
     """Test undo_edit validation."""
     # Create a test file
     content = 'line 1\nline 2\nline 3\n'
-    with open(temp_file, 'w') as f:
-        f.write(content)
+    with open(temp_file, 'wb') as f:
+        f.write(content.encode())
 
     # Try to undo without any previous edits
     result = file_editor(
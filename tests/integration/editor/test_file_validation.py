@@ -28,8 +28,8 @@ def test_file_validation(temp_file):
 
     # Test large file
     large_size = 11 * 1024 * 1024  # 11MB
-    with open(temp_file_sql, 'w') as f:
-        f.write('x' * large_size)
+    with open(temp_file_sql, 'wb') as f:
+        f.write(b'x' * large_size)
 
     result = file_editor(
         command='view',
@@ -46,8 +46,8 @@ def test_file_validation(temp_file):
     FROM users
     WHERE id = 1;
     """
-    with open(temp_file_sql, 'w') as f:
-        f.write(sql_content)
+    with open(temp_file_sql, 'wb') as f:
+        f.write(sql_content.encode())
 
     result = file_editor(
         command='view',
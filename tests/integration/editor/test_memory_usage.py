@@ -2,35 +2,33 @@
 
 import gc
 import os
+import resource
+import tracemalloc
 
-import psutil
+import numpy as np
 import pytest
 
 from openhands_aci.editor import file_editor
 
-from .conftest import parse_result
+from .conftest import (
+    build_line_offsets,
+    parse_result,
+    read_line_range,
+)
 
 
-def test_file_read_memory_usage(temp_file):
+@pytest.mark.slow
+def test_file_read_memory_usage(big_temp_file, proc):
     """Test that reading a large file uses memory efficiently."""
-    # Create a large file (9.5MB to stay under 10MB limit)
-    file_size_mb = 9.5
-    line_size = 100  # bytes per line approximately
-    num_lines = int((file_size_mb * 1024 * 1024) // line_size)
-
-    print(f'\nCreating test file with {num_lines} lines...')
-    with open(temp_file, 'w') as f:
-        for i in range(num_lines):
-            f.write(f'Line {i}: ' + 'x' * (line_size - 10) + '\n')
-
+    temp_file = big_temp_file
     actual_size = os.path.getsize(temp_file) / (1024 * 1024)
-    print(f'File created, size: {actual_size:.2f} MB')
+    print(f'\nUsing test file of size: {actual_size:.2f} MB')
 
     # Force Python to release file handles and clear buffers
     gc.collect()
 
     # Get initial memory usage
-    initial_memory = psutil.Process(os.getpid()).memory_info().rss
+    initial_memory = proc.memory_info().rss
     print(f'Initial memory usage: {initial_memory / 1024 / 1024:.2f} MB')
 
     # Test reading specific lines
@@ -46,7 +44,7 @@ def test_file_read_memory_usage(temp_file):
         raise
 
     # Check memory usage after reading
-    current_memory = psutil.Process(os.getpid()).memory_info().rss
+    current_memory = proc.memory_info().rss
     memory_growth = current_memory - initial_memory
     print(
         f'Memory growth after reading 100 lines: {memory_growth / 1024 / 1024:.2f} MB'
@@ -83,24 +81,33 @@ def test_file_read_memory_usage(temp_file):
     assert 'Line 5000:' in content, 'Should contain the first requested line'
     assert 'Line 5099:' in content, 'Should contain the last requested line'
 
+    # Compare against the requested range read straight from the file
+    offsets = build_line_offsets(temp_file)
+    expected_lines = read_line_range(temp_file, offsets, 5000, 5100).splitlines()
+    viewed_lines = [line.split('\t', 1)[1] for line in content.splitlines()]
+    assert viewed_lines[: len(expected_lines)] == expected_lines
+
     print('Test completed successfully')
 
 
-def test_file_editor_memory_leak(temp_file):
+@pytest.mark.slow
+def test_file_editor_memory_leak(temp_file, proc):
     """Test to demonstrate memory growth during multiple file edits."""
     print('\nStarting memory leak test...')
 
-    # Set memory limit to 128MB to make it more likely to catch issues
+    # Limit heap growth to 128MB to make it more likely to catch issues
     memory_limit = 128 * 1024 * 1024  # 128MB in bytes
+    data_limits = resource.getrlimit(resource.RLIMIT_DATA)
     try:
-        import resource
-
-        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        resource.setrlimit(
+            resource.RLIMIT_DATA,
+            (proc.memory_info().data + memory_limit, data_limits[1]),
+        )
         print('Memory limit set successfully')
     except Exception as e:
         print(f'Warning: Could not set memory limit: {str(e)}')
 
-    initial_memory = psutil.Process(os.getpid()).memory_info().rss
+    initial_memory = proc.memory_info().rss
     print(f'\nInitial memory usage: {initial_memory / 1024 / 1024:.2f} MB')
 
     # Create initial content that's large enough to test but not overwhelming
@@ -108,42 +115,47 @@ def test_file_editor_memory_leak(temp_file):
     base_content = (
         'Initial content with some reasonable length to make the file larger\n'
     )
-    content = base_content * 100
+    content = base_content.encode() * 100
     print(f'\nCreating initial file with {len(content)} bytes')
-    with open(temp_file, 'w') as f:
+    with open(temp_file, 'wb') as f:
         f.write(content)
     print(f'Initial file created, size: {os.path.getsize(temp_file) / 1024:.1f} KB')
 
+    # Overwrite the edit region in place instead of rewriting the whole file
+    fd = os.open(temp_file, os.O_RDWR)
+    insert_pos = os.fstat(fd).st_size // 2
+
+    # Track Python allocations for the assertions; they are cheap to sample and
+    # unlike RSS are not affected by allocator slack
+    tracemalloc.start()
+    initial_traced = tracemalloc.get_traced_memory()[0]
+
     try:
+        # Collect garbage only right before each memory reading, not in the hot loop
+        gc.disable()
+
+        num_iterations = 250
+        sample_every = 25
+
         # Store memory readings for analysis
-        memory_readings = []
+        memory_readings = np.empty(-(-num_iterations // sample_every), dtype=np.float32)
+        num_readings = 0
         file_size_mb = 0
 
         # Perform edits with reasonable content size
-        for i in range(1000):  # Increased iterations, smaller content per iteration
+        for i in range(num_iterations):  # Small content per iteration
             # Create content for each edit - keep it small to avoid file size limits
             old_content = f'content_{i}\n' * 5  # 5 lines per edit
             new_content = f'content_{i + 1}\n' * 5
 
             # Instead of appending, we'll replace content to keep file size stable
-            with open(temp_file, 'r') as f:
-                current_content = f.read()
-
-            # Insert old_content at a random position while keeping file size stable
-            insert_pos = len(current_content) // 2
-            new_file_content = (
-                current_content[:insert_pos]
-                + old_content
-                + current_content[insert_pos + len(old_content) :]
-            )
-            with open(temp_file, 'w') as f:
-                f.write(new_file_content)
+            os.pwrite(fd, old_content.encode(), insert_pos)
 
             # Perform the edit
             try:
                 if i == 0:
                     print(
-                        f'\nInitial file size: {os.path.getsize(temp_file) / (1024 * 1024):.2f} MB'
+                        f'\nInitial file size: {os.fstat(fd).st_size / (1024 * 1024):.2f} MB'
                     )
                     print(f'Sample content to replace: {old_content[:100]}...')
                 result = file_editor(
@@ -157,28 +169,27 @@ def test_file_editor_memory_leak(temp_file):
                     print(f'First edit result: {result[:200]}...')
             except Exception as e:
                 print(f'\nError during edit {i}:')
-                print(f'File size: {os.path.getsize(temp_file) / (1024 * 1024):.2f} MB')
+                print(f'File size: {os.fstat(fd).st_size / (1024 * 1024):.2f} MB')
                 print(f'Error: {str(e)}')
                 raise
 
-            if i % 25 == 0:  # Check more frequently
-                current_memory = psutil.Process(os.getpid()).memory_info().rss
+            if i % sample_every == 0:  # Check more frequently
+                gc.collect()
+                current_memory = tracemalloc.get_traced_memory()[0]
                 memory_mb = current_memory / 1024 / 1024
-                memory_readings.append(memory_mb)
+                memory_readings[num_readings] = memory_mb
+                num_readings += 1
 
                 # Get current file size
-                file_size_mb = os.path.getsize(temp_file) / (1024 * 1024)
+                file_size_mb = os.fstat(fd).st_size / (1024 * 1024)
 
                 print(f'\nIteration {i}:')
-                print(f'Memory usage: {memory_mb:.2f} MB')
+                print(f'Traced memory: {memory_mb:.2f} MB')
                 print(f'File size: {file_size_mb:.2f} MB')
 
                 # Calculate memory growth
-                memory_growth = current_memory - initial_memory
-                growth_percent = (memory_growth / initial_memory) * 100
-                print(
-                    f'Memory growth: {memory_growth / 1024 / 1024:.2f} MB ({growth_percent:.1f}%)'
-                )
+                memory_growth = current_memory - initial_traced
+                print(f'Memory growth: {memory_growth / 1024 / 1024:.2f} MB')
 
                 # Fail if memory growth is too high
                 assert memory_growth < memory_limit, (
@@ -187,9 +198,12 @@ def test_file_editor_memory_leak(temp_file):
                 )
 
                 # Check for consistent growth pattern
-                if len(memory_readings) >= 3:
+                if num_readings >= 3:
                     # Calculate growth rate between last 3 readings
-                    growth_rate = (memory_readings[-1] - memory_readings[-3]) / 2
+                    growth_rate = (
+                        memory_readings[num_readings - 1]
+                        - memory_readings[num_readings - 3]
+                    ) / 2
                     print(f'Recent growth rate: {growth_rate:.2f} MB per 50 edits')
 
                     # Fail if we see consistent growth above a threshold
@@ -208,10 +222,20 @@ def test_file_editor_memory_leak(temp_file):
             pytest.fail('Memory limit exceeded - possible memory leak detected')
         print(f'\nFinal file size: {file_size_mb:.2f} MB')
         raise
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+        os.close(fd)
+        resource.setrlimit(resource.RLIMIT_DATA, data_limits)
 
     # Print final statistics
+    final_memory = proc.memory_info().rss
     print('\nMemory usage statistics:')
-    print(f'Initial memory: {memory_readings[0]:.2f} MB')
-    print(f'Final memory: {memory_readings[-1]:.2f} MB')
-    print(f'Total growth: {(memory_readings[-1] - memory_readings[0]):.2f} MB')
+    memory_readings = memory_readings[:num_readings]
+    print(f'Initial traced memory: {memory_readings[0]:.2f} MB')
+    print(f'Final traced memory: {memory_readings[-1]:.2f} MB')
+    print(f'Total traced growth: {(memory_readings[-1] - memory_readings[0]):.2f} MB')
+    print(f'Mean growth between samples: {np.diff(memory_readings).mean():.3f} MB')
+    print(f'Initial RSS: {initial_memory / 1024 / 1024:.2f} MB')
+    print(f'Final RSS: {final_memory / 1024 / 1024:.2f} MB')
     print(f'Final file size: {file_size_mb:.2f} MB')
@@ -2,7 +2,7 @@
 
 import os
 import resource
-import tempfile
+import tracemalloc
 from pathlib import Path
 
 import psutil
@@ -10,19 +10,14 @@ import pytest
 
 from openhands_aci.editor import file_editor
 
+from .conftest import write_numbered_lines
+
+_PROC = psutil.Process()
+
 
 def get_memory_info():
-    """Get current and peak memory usage in bytes."""
-    process = psutil.Process(os.getpid())
-    rss = process.memory_info().rss
-    peak_rss = (
-        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
-    )  # Convert KB to bytes
-    return {
-        'rss': rss,
-        'peak_rss': peak_rss,
-        'max': max(rss, peak_rss),
-    }
+    """Get current memory usage in bytes."""
+    return {'rss': _PROC.memory_info().rss}
 
 
 def create_test_file(path: Path, size_mb: float = 5.0):
@@ -31,9 +26,17 @@ def create_test_file(path: Path, size_mb: float = 5.0):
     num_lines = int((size_mb * 1024 * 1024) // line_size)
 
     print(f'\nCreating test file with {num_lines} lines...')
-    with open(path, 'w') as f:
-        for i in range(num_lines):
-            f.write(f'Line {i}: ' + 'x' * (line_size - 10) + '\n')
+    write_numbered_lines(path, num_lines, line_size)
+
+    # Flush the file and drop it from the page cache so the tested operation
+    # starts from a cold cache
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
 
     actual_size = os.path.getsize(path)
     print(f'File created, size: {actual_size / 1024 / 1024:.2f} MB')
@@ -41,186 +44,104 @@ def create_test_file(path: Path, size_mb: float = 5.0):
 
 
 def set_memory_limit(file_size: int, multiplier: float = 2.0):
-    """Set memory limit to multiplier * file_size."""
-    # Add base memory for pytest and other processes (100MB)
-    base_memory = 100 * 1024 * 1024  # 100MB
-    memory_limit = int(file_size * multiplier + base_memory)
+    """Limit heap growth to multiplier * file_size plus Python overhead."""
+    # RLIMIT_DATA only covers the data segment and private writable mappings,
+    # unlike RLIMIT_AS which also counts shared libs and address-space reservations
+    overhead = 50 * 1024 * 1024  # 50MB, same allowance as check_memory_usage
     try:
+        # psutil only reports the data segment on Linux
+        current_usage = _PROC.memory_info().data
+        memory_limit = int(current_usage + file_size * multiplier + overhead)
         # Get current limits
-        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
-        # Only set limit if it's higher than current usage
-        current_usage = psutil.Process().memory_info().rss
-        if memory_limit > current_usage:
-            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
-            print(f'Memory limit set to {memory_limit / 1024 / 1024:.2f} MB')
-        else:
-            print(
-                f'Warning: Current memory usage ({current_usage / 1024 / 1024:.2f} MB) higher than limit ({memory_limit / 1024 / 1024:.2f} MB)'
-            )
+        soft, hard = resource.getrlimit(resource.RLIMIT_DATA)
+        resource.setrlimit(resource.RLIMIT_DATA, (memory_limit, hard))
+        print(f'Memory limit set to {memory_limit / 1024 / 1024:.2f} MB')
     except Exception as e:
         print(f'Warning: Could not set memory limit: {str(e)}')
+        return None
     return memory_limit
 
 
-def check_memory_usage(initial_memory: int, file_size: int, operation: str):
-    """Check if memory usage is within acceptable limits."""
-    current = get_memory_info()
-    memory_growth = current['max'] - initial_memory
-    print(f'Peak memory growth: {memory_growth / 1024 / 1024:.2f} MB')
+@pytest.fixture(autouse=True)
+def restore_memory_limit():
+    """Restore the data segment limit so it does not leak into later tests."""
+    limits = resource.getrlimit(resource.RLIMIT_DATA)
+    yield
+    resource.setrlimit(resource.RLIMIT_DATA, limits)
+
+
+def check_memory_usage(peak_memory: int, file_size: int, operation: str):
+    """Check if the traced peak memory of an operation is within acceptable limits."""
+    print(f'Peak traced memory: {peak_memory / 1024 / 1024:.2f} MB')
+    print(f'Current RSS: {get_memory_info()["rss"] / 1024 / 1024:.2f} MB')
 
     # Memory growth should be reasonable
     # Allow up to 2x file size for temporary buffers plus 50MB for Python overhead
     overhead = 50 * 1024 * 1024  # 50MB
     max_growth = int(file_size * 2 + overhead)
-    assert memory_growth < max_growth, (
-        f'Peak memory growth too high for {operation}: {memory_growth / 1024 / 1024:.2f} MB '
+    assert peak_memory < max_growth, (
+        f'Peak memory growth too high for {operation}: {peak_memory / 1024 / 1024:.2f} MB '
         f'(limit: {max_growth / 1024 / 1024:.2f} MB)'
     )
 
 
-def test_str_replace_peak_memory():
-    """Test that str_replace operation has reasonable peak memory usage."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        file_size = create_test_file(path)
-
-        # Force Python to release file handles and clear buffers
-        import gc
-
-        gc.collect()
-
-        # Get initial memory usage
-        initial = get_memory_info()
-        print(f'Initial memory usage: {initial["rss"] / 1024 / 1024:.2f} MB')
-
-        # Set memory limit
-        set_memory_limit(file_size)
-
-        # Perform str_replace operation
-        try:
-            _ = file_editor(
-                command='str_replace',
-                path=path,
-                old_str='Line 5000',  # Replace a line in the middle
-                new_str='Modified line',
-                enable_linting=False,
-            )
-        except MemoryError:
-            pytest.fail('Memory limit exceeded - peak memory usage too high')
-        except Exception as e:
-            if 'Cannot allocate memory' in str(e):
-                pytest.fail('Memory limit exceeded - peak memory usage too high')
-            raise
-
-        check_memory_usage(initial['max'], file_size, 'str_replace')
-
-
-def test_insert_peak_memory():
-    """Test that insert operation has reasonable peak memory usage."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        file_size = create_test_file(path)
-
-        # Force Python to release file handles and clear buffers
-        import gc
-
-        gc.collect()
-
-        # Get initial memory usage
-        initial = get_memory_info()
-        print(f'Initial memory usage: {initial["rss"] / 1024 / 1024:.2f} MB')
-
-        # Set memory limit
-        set_memory_limit(file_size)
-
-        # Perform insert operation
-        try:
-            _ = file_editor(
-                command='insert',
-                path=path,
-                insert_line=5000,  # Insert in the middle
-                new_str='New line inserted\n' * 10,
-                enable_linting=False,
-            )
-        except MemoryError:
-            pytest.fail('Memory limit exceeded - peak memory usage too high')
-        except Exception as e:
-            if 'Cannot allocate memory' in str(e):
-                pytest.fail('Memory limit exceeded - peak memory usage too high')
-            raise
-
-        check_memory_usage(initial['max'], file_size, 'insert')
-
-
-def test_view_peak_memory():
-    """Test that view operation has reasonable peak memory usage."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        file_size = create_test_file(path)
-
-        # Force Python to release file handles and clear buffers
-        import gc
-
-        gc.collect()
-
-        # Get initial memory usage
-        initial = get_memory_info()
-        print(f'Initial memory usage: {initial["rss"] / 1024 / 1024:.2f} MB')
-
-        # Set memory limit
-        set_memory_limit(file_size)
-
-        # Test viewing specific lines
-        try:
-            _ = file_editor(
-                command='view',
-                path=path,
-                view_range=[5000, 5100],  # View 100 lines from middle
-                enable_linting=False,
-            )
-        except MemoryError:
-            pytest.fail('Memory limit exceeded - peak memory usage too high')
-        except Exception as e:
-            if 'Cannot allocate memory' in str(e):
-                pytest.fail('Memory limit exceeded - peak memory usage too high')
-            raise
-
-        check_memory_usage(initial['max'], file_size, 'view')
-
-
-def test_view_full_file_peak_memory():
-    """Test that viewing entire file has reasonable peak memory usage."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        file_size = create_test_file(path, size_mb=5.0)  # Smaller file for full view
-
-        # Force Python to release file handles and clear buffers
-        import gc
-
-        gc.collect()
-
-        # Get initial memory usage
-        initial = get_memory_info()
-        print(f'Initial memory usage: {initial["rss"] / 1024 / 1024:.2f} MB')
-
-        # Set memory limit
-        set_memory_limit(file_size)
-
-        # Test viewing entire file
-        try:
-            _ = file_editor(
-                command='view',
-                path=path,
-                enable_linting=False,
-            )
-        except MemoryError:
+@pytest.fixture(scope='module')
+def big_file(tmp_path_factory):
+    """Create the 5MB test file once and share it between the peak memory tests."""
+    path = tmp_path_factory.mktemp('peak_memory') / 'big_file.txt'
+    file_size = create_test_file(path)
+    return path, file_size
+
+
+@pytest.mark.parametrize(
+    'command,kwargs',
+    [
+        # Replace a line in the middle
+        ('str_replace', {'old_str': 'Line 5000:', 'new_str': 'Modified line:'}),
+        # Insert in the middle
+        ('insert', {'insert_line': 5000, 'new_str': 'New line inserted\n' * 10}),
+        # View 100 lines from middle
+        ('view', {'view_range': [5000, 5100]}),
+        # View entire file
+        ('view', {}),
+    ],
+    ids=['str_replace', 'insert', 'view', 'view_full'],
+)
+def test_peak_memory(big_file, command, kwargs):
+    """Test that file operations have reasonable peak memory usage."""
+    path, file_size = big_file
+
+    # Force Python to release file handles and clear buffers
+    import gc
+
+    gc.collect()
+
+    # Get initial memory usage
+    initial = get_memory_info()
+    print(f'Initial memory usage: {initial["rss"] / 1024 / 1024:.2f} MB')
+
+    # Set memory limit
+    set_memory_limit(file_size)
+
+    tracemalloc.start()
+    try:
+        _ = file_editor(
+            command=command,
+            path=path,
+            enable_linting=False,
+            **kwargs,
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    except MemoryError:
+        pytest.fail('Memory limit exceeded - peak memory usage too high')
+    except Exception as e:
+        if 'Cannot allocate memory' in str(e):
             pytest.fail('Memory limit exceeded - peak memory usage too high')
-        except Exception as e:
-            if 'Cannot allocate memory' in str(e):
-                pytest.fail('Memory limit exceeded - peak memory usage too high')
-            raise
+        raise
+    finally:
+        tracemalloc.stop()
 
-        check_memory_usage(initial['max'], file_size, 'view_full')
+    check_memory_usage(peak, file_size, command)
 
 
 def test_large_history_insert():
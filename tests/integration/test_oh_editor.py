@@ -2,7 +2,6 @@ from pathlib import Path
 
 import pytest
 
-from openhands_aci.editor.editor import OHEditor
 from openhands_aci.editor.exceptions import (
     EditorToolParameterInvalidError,
     EditorToolParameterMissingError,
@@ -11,26 +10,32 @@ from openhands_aci.editor.exceptions import (
 from openhands_aci.editor.prompts import (
     DIRECTORY_CONTENT_TRUNCATED_NOTICE,
     FILE_CONTENT_TRUNCATED_NOTICE,
+    HISTORY_DROPPED_NOTICE,
 )
 from openhands_aci.editor.results import CLIResult, ToolResult
 
-
-@pytest.fixture
-def editor(tmp_path):
-    editor = OHEditor()
-    # Set up a temporary directory with test files
-    test_file = tmp_path / 'test.txt'
-    test_file.write_text('This is a test file.\nThis file is for testing purposes.')
-    return editor, test_file
-
-
-@pytest.fixture
-def editor_python_file_with_tabs(tmp_path):
-    editor = OHEditor()
-    # Set up a temporary directory with test files
-    test_file = tmp_path / 'test.py'
-    test_file.write_text('def test():\n\tprint("Hello, World!")')
-    return editor, test_file
+STR_REPLACE_OUTPUT_TMPL = (
+    "The file {path} has been edited. Here's the result of running `cat -n` on a snippet of {path}:\n"
+    '{snippet}\n'
+    '{lint}'
+    'Review the changes and make sure they are as expected. Edit the file again if necessary.'
+)
+INSERT_OUTPUT_TMPL = (
+    "The file {path} has been edited. Here's the result of running `cat -n` on a snippet of the edited file:\n"
+    '{snippet}\n'
+    '{lint}'
+    'Review the changes and make sure they are as expected (correct indentation, no duplicate lines, etc). Edit the file again if necessary.'
+)
+NO_LINT_ISSUES = '\nNo linting issues found in the changes.\n'
+SAMPLE_FILE_SNIPPET = (
+    '     1\tThis is a sample file.\n     2\tThis file is for testing purposes.'
+)
+INSERTED_LINE_SNIPPET = (
+    '     1\tThis is a test file.\n'
+    '     2\tInserted line\n'
+    '     3\tThis file is for testing purposes.'
+)
+_EXPANDED_TAB = '\t'.expandtabs()
 
 
 def test_view_file(editor):
@@ -60,7 +65,7 @@ def test_create_file(editor):
     result = editor(command='create', path=str(new_file), file_text='New file content')
     assert isinstance(result, ToolResult)
     assert new_file.exists()
-    assert new_file.read_text() == 'New file content'
+    assert new_file.read_bytes().decode() == 'New file content'
     assert 'File created successfully' in result.output
 
 
@@ -70,7 +75,7 @@ def test_create_with_empty_string(editor):
     result = editor(command='create', path=str(new_file), file_text='')
     assert isinstance(result, ToolResult)
     assert new_file.exists()
-    assert new_file.read_text() == ''
+    assert new_file.read_bytes().decode() == ''
     assert 'File created successfully' in result.output
 
 
@@ -82,47 +87,38 @@ def test_create_with_none_file_text(editor):
     assert 'file_text' in str(exc_info.value.message)
 
 
-def test_str_replace_no_linting(editor):
+@pytest.mark.parametrize(
+    'old_str,new_str,enable_linting,lint',
+    [
+        ('test file', 'sample file', False, ''),
+        (
+            'This is a test file.\nThis file is for testing purposes.',
+            'This is a sample file.\nThis file is for testing purposes.',
+            False,
+            '',
+        ),
+        ('test file', 'sample file', True, NO_LINT_ISSUES),
+    ],
+    ids=['no_linting', 'multi_line_no_linting', 'with_linting'],
+)
+def test_str_replace(editor, old_str, new_str, enable_linting, lint):
     editor, test_file = editor
     result = editor(
         command='str_replace',
         path=str(test_file),
-        old_str='test file',
-        new_str='sample file',
+        old_str=old_str,
+        new_str=new_str,
+        enable_linting=enable_linting,
     )
     assert isinstance(result, CLIResult)
 
     # Test str_replace command
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of {test_file}:
-     1\tThis is a sample file.
-     2\tThis file is for testing purposes.
-Review the changes and make sure they are as expected. Edit the file again if necessary."""
+    assert result.output == STR_REPLACE_OUTPUT_TMPL.format(
+        path=test_file, snippet=SAMPLE_FILE_SNIPPET, lint=lint
     )
 
     # Test that the file content has been updated
-    assert 'This is a sample file.' in test_file.read_text()
-
-
-def test_str_replace_multi_line_no_linting(editor):
-    editor, test_file = editor
-    result = editor(
-        command='str_replace',
-        path=str(test_file),
-        old_str='This is a test file.\nThis file is for testing purposes.',
-        new_str='This is a sample file.\nThis file is for testing purposes.',
-    )
-    assert isinstance(result, CLIResult)
-
-    # Test str_replace command
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of {test_file}:
-     1\tThis is a sample file.
-     2\tThis file is for testing purposes.
-Review the changes and make sure they are as expected. Edit the file again if necessary."""
-    )
+    assert 'This is a sample file.' in test_file.read_bytes().decode()
 
 
 def test_str_replace_multi_line_with_tabs_no_linting(editor_python_file_with_tabs):
@@ -135,40 +131,12 @@ def test_str_replace_multi_line_with_tabs_no_linting(editor_python_file_with_tab
     )
     assert isinstance(result, CLIResult)
 
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of {test_file}:
-     1\tdef test():
-     2\t{'\t'.expandtabs()}print("Hello, Universe!")
-Review the changes and make sure they are as expected. Edit the file again if necessary."""
-    )
-
-
-def test_str_replace_with_linting(editor):
-    editor, test_file = editor
-    result = editor(
-        command='str_replace',
-        path=str(test_file),
-        old_str='test file',
-        new_str='sample file',
-        enable_linting=True,
-    )
-    assert isinstance(result, CLIResult)
-
-    # Test str_replace command
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of {test_file}:
-     1\tThis is a sample file.
-     2\tThis file is for testing purposes.
-
-No linting issues found in the changes.
-Review the changes and make sure they are as expected. Edit the file again if necessary."""
+    assert result.output == STR_REPLACE_OUTPUT_TMPL.format(
+        path=test_file,
+        snippet=f'     1\tdef test():\n     2\t{_EXPANDED_TAB}print("Hello, Universe!")',
+        lint='',
     )
 
-    # Test that the file content has been updated
-    assert 'This is a sample file.' in test_file.read_text()
-
 
 def test_str_replace_error_multiple_occurrences(editor):
     editor, test_file = editor
@@ -187,7 +155,7 @@ def test_str_replace_error_multiple_multiline_occurrences(editor):
     print("Hello")
     return True"""
     content = f"{multi_block}\n\nprint('separator')\n\n{multi_block}"
-    test_file.write_text(content)
+    test_file.write_bytes(content.encode())
 
     with pytest.raises(ToolError) as exc_info:
         editor(
@@ -218,7 +186,7 @@ def test_str_replace_nonexistent_string(editor):
 
 def test_str_replace_with_empty_new_str(editor):
     editor, test_file = editor
-    test_file.write_text('Line 1\nLine to remove\nLine 3')
+    test_file.write_bytes(b'Line 1\nLine to remove\nLine 3')
     result = editor(
         command='str_replace',
         path=str(test_file),
@@ -226,12 +194,12 @@ def test_str_replace_with_empty_new_str(editor):
         new_str='',
     )
     assert isinstance(result, CLIResult)
-    assert test_file.read_text() == 'Line 1\nLine 3'
+    assert test_file.read_bytes().decode() == 'Line 1\nLine 3'
 
 
 def test_str_replace_with_empty_old_str(editor):
     editor, test_file = editor
-    test_file.write_text('Line 1\nLine 2\nLine 3')
+    test_file.write_bytes(b'Line 1\nLine 2\nLine 3')
     with pytest.raises(ToolError) as exc_info:
         editor(
             command='str_replace',
@@ -257,45 +225,29 @@ def test_str_replace_with_none_old_str(editor):
     assert 'old_str' in str(exc_info.value.message)
 
 
-def test_insert_no_linting(editor):
-    editor, test_file = editor
-    result = editor(
-        command='insert', path=str(test_file), insert_line=1, new_str='Inserted line'
-    )
-    assert isinstance(result, CLIResult)
-    assert 'Inserted line' in test_file.read_text()
-    print(result.output)
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of the edited file:
-     1\tThis is a test file.
-     2\tInserted line
-     3\tThis file is for testing purposes.
-Review the changes and make sure they are as expected (correct indentation, no duplicate lines, etc). Edit the file again if necessary."""
-    )
-
-
-def test_insert_with_linting(editor):
+@pytest.mark.parametrize(
+    'enable_linting,lint',
+    [(False, ''), (True, NO_LINT_ISSUES)],
+    ids=['no_linting', 'with_linting'],
+)
+def test_insert(editor, enable_linting, lint):
     editor, test_file = editor
     result = editor(
         command='insert',
         path=str(test_file),
         insert_line=1,
         new_str='Inserted line',
-        enable_linting=True,
+        enable_linting=enable_linting,
     )
     assert isinstance(result, CLIResult)
-    assert 'Inserted line' in test_file.read_text()
-    print(result.output)
-    assert (
-        result.output
-        == f"""The file {test_file} has been edited. Here's the result of running `cat -n` on a snippet of the edited file:
-     1\tThis is a test file.
-     2\tInserted line
-     3\tThis file is for testing purposes.
+    assert result.output == INSERT_OUTPUT_TMPL.format(
+        path=test_file, snippet=INSERTED_LINE_SNIPPET, lint=lint
+    )
 
-No linting issues found in the changes.
-Review the changes and make sure they are as expected (correct indentation, no duplicate lines, etc). Edit the file again if necessary."""
+    # The snippet is built from the new content in memory, so check the write once at the end
+    assert (
+        test_file.read_bytes().decode()
+        == 'This is a test file.\nInserted line\nThis file is for testing purposes.'
     )
 
 
@@ -323,7 +275,7 @@ def test_insert_with_empty_string(editor):
         new_str='',
     )
     assert isinstance(result, CLIResult)
-    content = test_file.read_text().splitlines()
+    content = test_file.read_bytes().decode().splitlines()
     assert '' in content
     assert len(content) == 3  # Original 2 lines plus empty line
 
@@ -353,7 +305,7 @@ def test_undo_edit(editor):
     result = editor(command='undo_edit', path=str(test_file))
     assert isinstance(result, CLIResult)
     assert 'Last edit to' in result.output
-    assert 'test file' in test_file.read_text()  # Original content restored
+    assert 'test file' in test_file.read_bytes().decode()  # Original content restored
 
 
 def test_multiple_undo_edits(editor):
@@ -376,13 +328,15 @@ def test_multiple_undo_edits(editor):
     result = editor(command='undo_edit', path=str(test_file))
     assert isinstance(result, CLIResult)
     assert 'Last edit to' in result.output
-    assert 'sample file v1' in test_file.read_text()  # Previous content restored
+    assert (
+        'sample file v1' in test_file.read_bytes().decode()
+    )  # Previous content restored
 
     # Undo the first edit
     result = editor(command='undo_edit', path=str(test_file))
     assert isinstance(result, CLIResult)
     assert 'Last edit to' in result.output
-    assert 'test file' in test_file.read_text()  # Original content restored
+    assert 'test file' in test_file.read_bytes().decode()  # Original content restored
 
 
 def test_validate_path_invalid(editor):
@@ -428,25 +382,48 @@ def test_insert_missing_line_param(editor):
 def test_undo_edit_no_history_error(editor):
     editor, test_file = editor
     empty_file = test_file.parent / 'empty.txt'
-    empty_file.write_text('')
+    empty_file.write_bytes(b'')
     with pytest.raises(ToolError):
         editor(command='undo_edit', path=str(empty_file))
 
 
-def test_view_directory_with_hidden_files(tmp_path):
-    editor = OHEditor()
+def test_edit_above_history_cap(editor, monkeypatch):
+    editor, test_file = editor
+    # The test file is 55 characters, above the lowered cap
+    monkeypatch.setattr(editor._history_manager, 'max_entry_len', 40)
+    notice = HISTORY_DROPPED_NOTICE.format(max_len=40)
+
+    result = editor(
+        command='str_replace',
+        path=str(test_file),
+        old_str='test file',
+        new_str='sample file',
+    )
+    assert result.output.endswith('\n' + notice)
+    result = editor(
+        command='insert', path=str(test_file), insert_line=1, new_str='Inserted line'
+    )
+    assert result.output.endswith('\n' + notice)
+
+    # Undo explains why there is nothing to restore
+    with pytest.raises(ToolError, match='exceeded 40 characters'):
+        editor(command='undo_edit', path=str(test_file))
+
+
+def test_view_directory_with_hidden_files(oh_editor, tmp_path):
+    editor = oh_editor
 
     # Create a directory with some test files
     test_dir = tmp_path / 'test_dir'
     test_dir.mkdir()
-    (test_dir / 'visible.txt').write_text('content1')
-    (test_dir / '.hidden1').write_text('hidden1')
-    (test_dir / '.hidden2').write_text('hidden2')
+    (test_dir / 'visible.txt').write_bytes(b'content1')
+    (test_dir / '.hidden1').write_bytes(b'hidden1')
+    (test_dir / '.hidden2').write_bytes(b'hidden2')
 
     # Create a hidden subdirectory with a file
     hidden_subdir = test_dir / '.hidden_dir'
     hidden_subdir.mkdir()
-    (hidden_subdir / 'file.txt').write_text('content3')
+    (hidden_subdir / 'file.txt').write_bytes(b'content3')
 
     # Create a visible subdirectory
     visible_subdir = test_dir / 'visible_dir'
@@ -469,30 +446,13 @@ def test_view_directory_with_hidden_files(tmp_path):
     assert 'ls -la' in result.output  # Shows command to view hidden files
 
 
-def test_view_symlinked_directory(tmp_path):
-    editor = OHEditor()
-
-    # Create a directory with some test files
-    source_dir = tmp_path / 'source_dir'
-    source_dir.mkdir()
-    (source_dir / 'file1.txt').write_text('content1')
-    (source_dir / 'file2.txt').write_text('content2')
-
-    # Create a subdirectory with a file
-    subdir = source_dir / 'subdir'
-    subdir.mkdir()
-    (subdir / 'file3.txt').write_text('content3')
-
-    # Create a symlink to the directory
-    symlink_dir = tmp_path / 'symlink_dir'
-    symlink_dir.symlink_to(source_dir)
-
+def test_view_symlinked_directory(oh_editor, symlink_tree):
     # View the symlinked directory
-    result = editor(command='view', path=str(symlink_dir))
+    result = oh_editor(command='view', path=str(symlink_tree))
 
     # Verify that all files are listed through the symlink
     assert isinstance(result, CLIResult)
-    assert str(symlink_dir) in result.output
+    assert str(symlink_tree) in result.output
     assert 'file1.txt' in result.output
     assert 'file2.txt' in result.output
     assert 'subdir' in result.output
@@ -505,14 +465,14 @@ def test_view_large_directory_with_truncation(editor, tmp_path):
     large_dir = tmp_path / 'large_dir'
     large_dir.mkdir()
     for i in range(1000):  # 1000 files should trigger truncation
-        (large_dir / f'file_{i}.txt').write_text('content')
+        (large_dir / f'file_{i}.txt').write_bytes(b'content')
 
     result = editor(command='view', path=str(large_dir))
     assert isinstance(result, CLIResult)
     assert DIRECTORY_CONTENT_TRUNCATED_NOTICE in result.output
 
 
-def test_view_directory_on_hidden_path(tmp_path):
+def test_view_directory_on_hidden_path(oh_editor, tmp_path):
     """Directory structure:
     .test_dir/
     ├── visible1.txt
@@ -525,25 +485,25 @@ def test_view_directory_on_hidden_path(tmp_path):
         └── .hidden3
     """
 
-    editor = OHEditor()
+    editor = oh_editor
 
     # Create a directory with test files at depth 1
     hidden_test_dir = tmp_path / '.hidden_test_dir'
     hidden_test_dir.mkdir()
-    (hidden_test_dir / 'visible1.txt').write_text('content1')
-    (hidden_test_dir / '.hidden1').write_text('hidden1')
+    (hidden_test_dir / 'visible1.txt').write_bytes(b'content1')
+    (hidden_test_dir / '.hidden1').write_bytes(b'hidden1')
 
     # Create a visible subdirectory with visible and hidden files
     visible_subdir = hidden_test_dir / 'visible_dir'
     visible_subdir.mkdir()
-    (visible_subdir / 'visible2.txt').write_text('content2')
-    (visible_subdir / '.hidden2').write_text('hidden2')
+    (visible_subdir / 'visible2.txt').write_bytes(b'content2')
+    (visible_subdir / '.hidden2').write_bytes(b'hidden2')
 
     # Create a hidden subdirectory with visible and hidden files
     hidden_subdir = hidden_test_dir / '.hidden_dir'
     hidden_subdir.mkdir()
-    (hidden_subdir / 'visible3.txt').write_text('content3')
-    (hidden_subdir / '.hidden3').write_text('hidden3')
+    (hidden_subdir / 'visible3.txt').write_bytes(b'content3')
+    (hidden_subdir / '.hidden3').write_bytes(b'hidden3')
 
     # View the directory
     result = editor(command='view', path=str(hidden_test_dir))
@@ -575,7 +535,7 @@ def test_view_large_file_with_truncation(editor, tmp_path):
     # Create a large file to trigger truncation
     large_file = tmp_path / 'large_test.txt'
     large_content = 'Line 1\n' * 16000  # 16000 lines should trigger truncation
-    large_file.write_text(large_content)
+    large_file.write_bytes(large_content.encode())
 
     result = editor(command='view', path=str(large_file))
     assert isinstance(result, CLIResult)
@@ -0,0 +1,86 @@
+import os
+import signal
+import threading
+import time
+
+import psutil
+import pytest
+
+from openhands_aci.utils.shell import run_shell_cmd
+
+
+def test_run_shell_cmd_success():
+    """Test running a real shell command end to end."""
+    cmd = "echo 'Hello, World!'"
+    returncode, stdout, stderr = run_shell_cmd(cmd)
+
+    assert returncode == 0
+    assert stdout.strip() == 'Hello, World!'
+    assert stderr == ''
+
+
+def _record_children(delay: float) -> list[psutil.Process]:
+    """Record the descendants of this process after `delay` seconds, in the background."""
+    procs: list[psutil.Process] = []
+    threading.Timer(
+        delay, lambda: procs.extend(psutil.Process().children(recursive=True))
+    ).start()
+    return procs
+
+
+def _alive(procs: list[psutil.Process]) -> list[psutil.Process]:
+    """Return the processes in `procs` that are still running."""
+    alive = []
+    for p in procs:
+        try:
+            if p.is_running() and p.status() != psutil.STATUS_ZOMBIE:
+                alive.append(p)
+        except psutil.NoSuchProcess:
+            pass
+    return alive
+
+
+def _assert_all_exit(procs: list[psutil.Process]):
+    # SIGKILL is delivered asynchronously, give the kernel a moment
+    deadline = time.monotonic() + 2
+    while _alive(procs) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _alive(procs) == []
+
+
+def test_run_shell_cmd_timeout_kills_pipeline():
+    """Test that a timeout kills every stage of a pipeline, not just the shell."""
+    procs = _record_children(0.5)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        run_shell_cmd('sleep 30 | sleep 30', timeout=1)
+    assert time.monotonic() - start < 3
+
+    # The shell and both stages of the pipeline
+    assert len(procs) >= 2
+    _assert_all_exit(procs)
+
+
+def test_run_shell_cmd_interrupt_kills_pipeline():
+    """Test that an interrupt while waiting kills the pipeline before propagating."""
+    procs = _record_children(0.5)
+    threading.Timer(1, os.kill, (os.getpid(), signal.SIGINT)).start()
+    with pytest.raises(KeyboardInterrupt):
+        run_shell_cmd('sleep 30 | sleep 30', timeout=None)
+
+    assert len(procs) >= 2
+    _assert_all_exit(procs)
+
+
+def test_run_shell_cmd_timeout_ignores_detached_children():
+    """Test that a child outside the process group holding the pipes does not delay the timeout."""
+    procs = _record_children(0.5)
+    start = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError):
+            run_shell_cmd('setsid sleep 4 & sleep 30', timeout=1)
+        assert time.monotonic() - start < 3
+    finally:
+        # The detached sleep survives the group kill by design
+        for p in _alive(procs):
+            p.kill()
@@ -1,19 +1,33 @@
 import pytest
 
+from openhands_aci.linter.impl.treesitter import TreesitterBasicLinter
 
-@pytest.fixture
-def syntax_error_py_file(tmp_path):
+
+@pytest.fixture(scope='session')
+def syntax_error_py_file(tmp_path_factory):
+    # Only ever read by the linters, so one copy serves every test
     file_content = """
     def foo():
         print("Hello, World!")
     print("Wrong indent")
     foo(
     """
-    file_path = tmp_path / 'test_file.py'
+    file_path = tmp_path_factory.mktemp('syntax_error') / 'test_file.py'
     file_path.write_text(file_content)
     return str(file_path)
 
 
+@pytest.fixture(scope='session')
+def treesitter_linter():
+    return TreesitterBasicLinter()
+
+
+@pytest.fixture(scope='session')
+def parsed_syntax_error(treesitter_linter, syntax_error_py_file):
+    """Lint the syntax error file once and share the results."""
+    return syntax_error_py_file, treesitter_linter.lint(syntax_error_py_file)
+
+
 @pytest.fixture
 def wrongly_indented_py_file(tmp_path):
     file_content = """
@@ -1,10 +1,8 @@
 from openhands_aci.linter import DefaultLinter, LintResult
-from openhands_aci.linter.impl.treesitter import TreesitterBasicLinter
 
 
-def test_syntax_error_py_file(syntax_error_py_file):
-    linter = TreesitterBasicLinter()
-    result = linter.lint(syntax_error_py_file)
+def test_syntax_error_py_file(parsed_syntax_error):
+    syntax_error_py_file, result = parsed_syntax_error
     print(result)
     assert isinstance(result, list) and len(result) == 1
     assert result[0] == LintResult(
@@ -34,9 +32,8 @@ def test_syntax_error_py_file(syntax_error_py_file):
     assert general_result != result
 
 
-def test_simple_correct_ruby_file(simple_correct_ruby_file):
-    linter = TreesitterBasicLinter()
-    result = linter.lint(simple_correct_ruby_file)
+def test_simple_correct_ruby_file(treesitter_linter, simple_correct_ruby_file):
+    result = treesitter_linter.lint(simple_correct_ruby_file)
     assert isinstance(result, list) and len(result) == 0
 
     # Test that the general linter also returns the same result
@@ -45,9 +42,8 @@ def test_simple_correct_ruby_file(simple_correct_ruby_file):
     assert general_result == result
 
 
-def test_simple_incorrect_ruby_file(simple_incorrect_ruby_file):
-    linter = TreesitterBasicLinter()
-    result = linter.lint(simple_incorrect_ruby_file)
+def test_simple_incorrect_ruby_file(treesitter_linter, simple_incorrect_ruby_file):
+    result = treesitter_linter.lint(simple_incorrect_ruby_file)
     print(result)
     assert isinstance(result, list) and len(result) == 2
     assert result[0] == LintResult(
@@ -89,9 +85,10 @@ def test_simple_incorrect_ruby_file(simple_incorrect_ruby_file):
     assert general_result == result
 
 
-def test_parenthesis_incorrect_ruby_file(parenthesis_incorrect_ruby_file):
-    linter = TreesitterBasicLinter()
-    result = linter.lint(parenthesis_incorrect_ruby_file)
+def test_parenthesis_incorrect_ruby_file(
+    treesitter_linter, parenthesis_incorrect_ruby_file
+):
+    result = treesitter_linter.lint(parenthesis_incorrect_ruby_file)
     print(result)
     assert isinstance(result, list) and len(result) == 1
     assert result[0] == LintResult(
@@ -1,142 +1,184 @@
 """Tests for file history management."""
 
-import tempfile
-from pathlib import Path
-
 from openhands_aci.editor.history import FileHistoryManager
 
 
-def test_default_history_limit():
+def test_default_history_limit(tmp_path):
     """Test that default history limit is 5 entries."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        manager = FileHistoryManager()
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager()
 
-        # Add 6 entries - this should trigger removal of the first entry
-        for i in range(6):
-            manager.add_history(path, f'content{i}')
+    # Add 6 entries - this should trigger removal of the first entry
+    for i in range(6):
+        manager.add_history(path, f'content{i}')
 
-        # Get the metadata
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 5  # Should only keep last 5 entries
-        # First entry should be content1, last should be content5
-        assert manager.get_all_history(path)[0].startswith('content1')
-        assert manager.get_all_history(path)[-1].startswith('content5')
+    # Get the metadata
+    metadata = manager.get_metadata(path)
+    assert len(metadata['entries']) == 5  # Should only keep last 5 entries
+    # First entry should be content1, last should be content5
+    assert manager.get_all_history(path)[0].startswith('content1')
+    assert manager.get_all_history(path)[-1].startswith('content5')
 
 
-def test_history_keys_are_unique():
+def test_history_keys_are_unique(tmp_path):
     """Test that history keys remain unique even after removing old entries."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        manager = FileHistoryManager(max_history_per_file=2)
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager(max_history_per_file=2)
 
-        # Add 3 entries - this should trigger removal of the first entry
-        manager.add_history(path, 'content1')
-        manager.add_history(path, 'content2')
-        manager.add_history(path, 'content3')
+    # Add 3 entries - this should trigger removal of the first entry
+    manager.add_history_many(path, ['content1', 'content2', 'content3'])
 
-        # Get the metadata
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 2  # Should only keep last 2 entries
+    # Get the metadata
+    metadata = manager.get_metadata(path)
+    assert len(metadata['entries']) == 2  # Should only keep last 2 entries
 
-        # Keys should be unique and sequential
-        keys = metadata['entries']
-        assert len(set(keys)) == len(keys)  # All keys should be unique
-        assert sorted(keys) == keys  # Keys should be sequential
+    # Keys should be unique and sequential
+    keys = metadata['entries']
+    assert len(set(keys)) == len(keys)  # All keys should be unique
+    assert sorted(keys) == keys  # Keys should be sequential
+    assert keys == [1, 2]  # The oldest key was evicted
 
-        # Add another entry
-        manager.add_history(path, 'content4')
-        new_metadata = manager.get_metadata(path)
-        new_keys = new_metadata['entries']
+    # Add another entry
+    manager.add_history(path, 'content4')
+    new_metadata = manager.get_metadata(path)
+    new_keys = new_metadata['entries']
 
-        # New key should be greater than all previous keys
-        assert min(new_keys) > min(keys)
-        assert len(set(new_keys)) == len(new_keys)  # All keys should still be unique
+    # New key should be greater than all previous keys
+    assert min(new_keys) > min(keys)
+    assert new_keys == [2, 3]
+    assert len(set(new_keys)) == len(new_keys)  # All keys should still be unique
 
 
-def test_history_counter_persists():
+def test_history_counter_persists(tmp_path):
     """Test that history counter persists across manager instances."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        path = Path(temp_dir) / 'test.txt'
-        path.write_text('initial')
+    path = tmp_path / 'test.txt'
+    path.write_text('initial')
+    history_dir = tmp_path / 'hist'
+    history_dir.mkdir()
+
+    # First manager instance
+    manager1 = FileHistoryManager(history_dir=history_dir)
+    manager1.add_history_many(path, ['content1', 'content2'])
+
+    # Second manager instance using same directory
+    manager2 = FileHistoryManager(history_dir=history_dir)
+    manager2.add_history(path, 'content3')
+
+    # Get metadata
+    metadata = manager2.get_metadata(path)
+    keys = metadata['entries']
+
+    # Keys should be sequential even across instances
+    assert len(set(keys)) == len(keys)  # All keys should be unique
+    assert sorted(keys) == keys  # Keys should be sequential
+
 
-        # First manager instance
-        manager1 = FileHistoryManager(history_dir=Path(temp_dir))
-        manager1.add_history(path, 'content1')
-        manager1.add_history(path, 'content2')
+def test_clear_history_keeps_counter(tmp_path):
+    """Test that clearing history keeps the counter increasing."""
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager()
 
-        # Second manager instance using same directory
-        manager2 = FileHistoryManager(history_dir=Path(temp_dir))
-        manager2.add_history(path, 'content3')
+    # Add some entries
+    manager.add_history_many(path, ['content1', 'content2'])
+    last_key = manager.get_metadata(path)['entries'][-1]
 
-        # Get metadata
-        metadata = manager2.get_metadata(path)
-        keys = metadata['entries']
+    # Clear history
+    manager.clear_history(path)
 
-        # Keys should be sequential even across instances
-        assert len(set(keys)) == len(keys)  # All keys should be unique
-        assert sorted(keys) == keys  # Keys should be sequential
+    # Entries are gone but the counter is kept
+    metadata = manager.get_metadata(path)
+    assert metadata['entries'] == []
+    assert metadata['counter'] == last_key + 1
 
+    # New entries continue after the last key instead of reusing it
+    manager.add_history(path, 'new_content')
+    metadata = manager.get_metadata(path)
+    assert metadata['entries'] == [last_key + 1]
+    assert manager.get_all_history(path) == ['new_content']
 
-def test_clear_history_resets_counter():
-    """Test that clearing history resets the counter."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        manager = FileHistoryManager()
 
-        # Add some entries
-        manager.add_history(path, 'content1')
-        manager.add_history(path, 'content2')
+def test_oversized_entry_is_not_stored(tmp_path):
+    """Test that entries above max_entry_len are skipped and clear stale history."""
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager(max_entry_len=10)
 
-        # Clear history
-        manager.clear_history(path)
+    assert manager.add_history(path, 'small') is True
+    assert manager.add_history(path, 'x' * 11) is False
 
-        # Counter should be reset
-        metadata = manager.get_metadata(path)
-        assert metadata['counter'] == 0
+    # The oversized entry is dropped along with the older, now unreachable, entry
+    assert manager.get_all_history(path) == []
+    assert manager.pop_last_history(path) is None
 
-        # Adding new entries should start from 0
-        manager.add_history(path, 'new_content')
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 1
-        assert metadata['entries'][0] == 0  # First key should be 0
+    # Small entries are recorded again afterwards
+    manager.add_history(path, 'small2')
+    assert manager.get_all_history(path) == ['small2']
 
 
-def test_pop_last_history_removes_entry():
+def test_pop_last_history_removes_entry(tmp_path):
     """Test that pop_last_history removes the latest entry."""
-    with tempfile.NamedTemporaryFile() as temp_file:
-        path = Path(temp_file.name)
-        manager = FileHistoryManager()
-
-        # Add some entries
-        manager.add_history(path, 'content1')
-        manager.add_history(path, 'content2')
-        manager.add_history(path, 'content3')
-
-        # Pop the last history entry
-        last_entry = manager.pop_last_history(path)
-        assert last_entry == 'content3'
-
-        # Check that the entry has been removed
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 2
-
-        # Pop the last history entry again
-        last_entry = manager.pop_last_history(path)
-        assert last_entry == 'content2'
-
-        # Check that the entry has been removed
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 1
-
-        # Pop the last history entry one more time
-        last_entry = manager.pop_last_history(path)
-        assert last_entry == 'content1'
-
-        # Check that all entries have been removed
-        metadata = manager.get_metadata(path)
-        assert len(metadata['entries']) == 0
-
-        # Try to pop last history when there are no entries
-        last_entry = manager.pop_last_history(path)
-        assert last_entry is None
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager()
+
+    # Add some entries
+    manager.add_history(path, 'content1')
+    manager.add_history(path, 'content2')
+    manager.add_history(path, 'content3')
+
+    # Pop the last history entry
+    last_entry = manager.pop_last_history(path)
+    assert last_entry == 'content3'
+
+    # Check that the entry has been removed
+    metadata = manager.get_metadata(path)
+    assert len(metadata['entries']) == 2
+
+    # Pop the last history entry again
+    last_entry = manager.pop_last_history(path)
+    assert last_entry == 'content2'
+
+    # Check that the entry has been removed
+    metadata = manager.get_metadata(path)
+    assert len(metadata['entries']) == 1
+
+    # Pop the last history entry one more time
+    last_entry = manager.pop_last_history(path)
+    assert last_entry == 'content1'
+
+    # Check that all entries have been removed
+    metadata = manager.get_metadata(path)
+    assert len(metadata['entries']) == 0
+
+    # Try to pop last history when there are no entries
+    last_entry = manager.pop_last_history(path)
+    assert last_entry is None
+
+
+def test_history_delta_reconstruction(tmp_path):
+    """Test that delta-encoded history entries are rebuilt exactly."""
+    path = tmp_path / 'test.txt'
+    path.touch()
+    manager = FileHistoryManager(history_dir=tmp_path / 'hist')
+
+    lines = [f'line {i}\n' for i in range(2000)]
+    versions = []
+    for i in range(4):
+        lines[i * 500] = f'edited {i}\n'
+        versions.append(''.join(lines))
+    manager.add_history_many(path, versions)
+
+    # Only the newest entry is stored in full, older ones hold just the edited region
+    stored = manager.cache.get(manager._get_history_key(str(path)))
+    assert stored[-1] == versions[-1]
+    assert all(len(delta[2]) < 100 for delta in stored[:-1])
+
+    assert manager.get_all_history(path) == versions
+
+    # Undo walks back through every version
+    for expected in reversed(versions):
+        assert manager.pop_last_history(path) == expected
+    assert manager.pop_last_history(path) is None
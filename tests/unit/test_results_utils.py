@@ -36,6 +36,17 @@ def test_maybe_truncate_with_truncation():
     assert result == content[:MAX_RESPONSE_LEN_CHAR] + CONTENT_TRUNCATED_NOTICE
 
 
+def test_maybe_truncate_bytes():
+    """Test maybe_truncate with bytes content."""
+    content = b'a' * (MAX_RESPONSE_LEN_CHAR + 10)
+    result = maybe_truncate(content, truncate_after=MAX_RESPONSE_LEN_CHAR)
+    assert isinstance(result, bytes)
+    assert result == content[:MAX_RESPONSE_LEN_CHAR] + CONTENT_TRUNCATED_NOTICE.encode()
+
+    short = b'Short content'
+    assert maybe_truncate(short, truncate_after=MAX_RESPONSE_LEN_CHAR) is short
+
+
 def test_maybe_truncate_no_limit():
     """Test maybe_truncate when truncate_after is None."""
     content = 'Content that exceeds the default max length'
@@ -1,3 +1,4 @@
+import signal
 import subprocess
 from unittest.mock import MagicMock, patch
 
@@ -8,37 +9,78 @@ from openhands_aci.editor.prompts import CONTENT_TRUNCATED_NOTICE
 from openhands_aci.utils.shell import check_tool_installed, run_shell_cmd
 
 
-def test_run_shell_cmd_success():
+@pytest.fixture(autouse=True)
+def mock_popen():
+    """Patch subprocess.Popen for every test so none of them spawns a real process."""
+    with patch('subprocess.Popen') as mock_popen:
+        yield mock_popen
+
+
+def set_popen_result(mock_popen, stdout='', stderr='', returncode=0):
+    """Make the patched Popen return a process with the given output and exit code."""
+    mock_process = MagicMock()
+    mock_process.pid = 12345
+    mock_process.communicate.return_value = (stdout, stderr)
+    mock_process.returncode = returncode
+    # subprocess.run() uses the process as a context manager and polls it
+    mock_process.__enter__.return_value = mock_process
+    mock_process.poll.return_value = returncode
+    mock_popen.return_value = mock_process
+    return mock_process
+
+
+def test_run_shell_cmd_success(mock_popen):
     """Test running a successful shell command."""
+    set_popen_result(mock_popen, stdout='Hello, World!\n')
+
     cmd = "echo 'Hello, World!'"
     returncode, stdout, stderr = run_shell_cmd(cmd)
 
     assert returncode == 0
     assert stdout.strip() == 'Hello, World!'
     assert stderr == ''
+    assert mock_popen.call_args.args[0] == cmd
 
 
-@patch('subprocess.Popen')
-def test_run_shell_cmd_timeout(mock_popen):
+@patch('os.killpg')
+def test_run_shell_cmd_timeout(mock_killpg, mock_popen):
     """Test that a TimeoutError is raised if command times out."""
-    mock_process = MagicMock()
+    mock_process = set_popen_result(mock_popen)
     mock_process.communicate.side_effect = subprocess.TimeoutExpired(
         cmd='sleep 2', timeout=1
     )
-    mock_popen.return_value = mock_process
 
     with pytest.raises(TimeoutError, match="Command 'sleep 2' timed out"):
         run_shell_cmd('sleep 2', timeout=1)
 
+    # The whole process group of the shell is killed, not just the shell
+    assert mock_popen.call_args.kwargs['start_new_session'] is True
+    mock_killpg.assert_called_once_with(12345, signal.SIGKILL)
+
+    # The shell is reaped without reading its pipes again
+    mock_process.communicate.assert_called_once()
+    mock_process.wait.assert_called_once_with()
+    mock_process.stdout.close.assert_called_once_with()
+    mock_process.stderr.close.assert_called_once_with()
+
+
+@patch('os.killpg')
+def test_run_shell_cmd_interrupt(mock_killpg, mock_popen):
+    """Test that an interrupt kills the process group before propagating."""
+    mock_process = set_popen_result(mock_popen)
+    mock_process.communicate.side_effect = KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_shell_cmd('sleep 2')
+
+    mock_killpg.assert_called_once_with(12345, signal.SIGKILL)
+    mock_process.wait.assert_called_once_with()
+
 
-@patch('subprocess.Popen')
 def test_run_shell_cmd_truncation(mock_popen):
     """Test that stdout and stderr are truncated correctly."""
     long_output = 'a' * (MAX_RESPONSE_LEN_CHAR + 10)
-    mock_process = MagicMock()
-    mock_process.communicate.return_value = (long_output, long_output)
-    mock_process.returncode = 0
-    mock_popen.return_value = mock_process
+    set_popen_result(mock_popen, stdout=long_output, stderr=long_output)
 
     returncode, stdout, stderr = run_shell_cmd('echo long_output')
 
@@ -47,13 +89,20 @@ def test_run_shell_cmd_truncation(mock_popen):
     assert len(stderr) <= MAX_RESPONSE_LEN_CHAR + len(CONTENT_TRUNCATED_NOTICE)
 
 
-def test_check_tool_installed_whoami():
+def test_check_tool_installed_whoami(mock_popen):
     """Test check_tool_installed returns True for an installed tool (whoami)."""
-    # 'python' is usually available if Python is installed
+    set_popen_result(mock_popen, stdout='whoami (GNU coreutils)\n')
     assert check_tool_installed('whoami') is True
+    assert mock_popen.call_args.args[0] == ['whoami', '--version']
 
 
-def test_check_tool_installed_nonexistent_tool():
+def test_check_tool_installed_nonexistent_tool(mock_popen):
     """Test check_tool_installed returns False for a nonexistent tool."""
-    # Use a made-up tool name that is very unlikely to exist
+    mock_popen.side_effect = FileNotFoundError('nonexistent_tool_xyz')
     assert check_tool_installed('nonexistent_tool_xyz') is False
+
+
+def test_check_tool_installed_failing_tool(mock_popen):
+    """Test check_tool_installed returns False when the tool exits with an error."""
+    set_popen_result(mock_popen, returncode=1)
+    assert check_tool_installed('broken_tool') is False